@@ -12,10 +12,16 @@ import sys
 import csv
 import json
 import os
-from collections import deque
-import statistics
 import time
 
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; fall back to the plain function
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
 # Constants
 COLOR_RANGES = {
     'orange': {'low': [9, 110, 30], 'high': [95, 255, 255]},
@@ -25,6 +31,13 @@ COLOR_RANGES = {
 }
 
 KERNEL_SIZE = 5
+DOWNSCALE = 2  # Segmentation runs at 1/DOWNSCALE resolution (pyrDown)
+CAMERA_WIDTH = 640
+CAMERA_HEIGHT = 480
+CAMERA_FPS = 30
+FRAME_STRIDE = 2  # Decode and process every Nth camera frame
+ROI_RADIUS = 50  # Search-window half-size around a marker's last position
+RECENT_WINDOW = 30  # Ring-buffer size for the angle trend display
 WINDOW_WIDTH = 600
 WINDOW_HEIGHT = 400
 CIRCLE_RADIUS = 15
@@ -33,6 +46,7 @@ LINE_THICKNESS = 8
 FONT_SCALE = 3
 FONT_THICKNESS = 5
 ESC_KEY = 27
+CSV_FLUSH_ROWS = 256  # Buffered result rows written per file open
 
 # Colors for drawing (BGR format)
 COLORS = {
@@ -46,6 +60,51 @@ COLORS = {
     'text_black': (0, 0, 0)
 }
 
+# Labels and colors for the integer codes returned by process_markers
+MOVEMENT_LABELS = ('radial', 'ulnar')
+FEEDBACK_LABELS = ('GREAT', 'TOO LITTLE', 'TOO FAR')
+FEEDBACK_COLORS = (COLORS['text_good'], COLORS['text_bad'], COLORS['text_bad'])
+
+
+@njit(cache=True)
+def process_markers(ox, oy, yx, yy, px, py, bx, by, arm_is_right,
+                    min_radial, max_radial, min_ulnar, max_ulnar):
+    """Per-frame marker math: angle, movement type and feedback verdict.
+
+    Returns (angle, movement_code, feedback_code) where movement codes
+    are 0 = radial, 1 = ulnar and feedback codes are 0 = GREAT,
+    1 = TOO LITTLE, 2 = TOO FAR.
+    """
+    # Line 1: orange to blue; Line 2: yellow to pink
+    dx1 = bx - ox
+    dy1 = by - oy
+    dx2 = px - yx
+    dy2 = py - yy
+
+    # atan2 needs no magnitude division, so there is no zero-denominator
+    # or acos domain-error case to guard against
+    cross = dx1 * dy2 - dy1 * dx2
+    dot_product = dx1 * dx2 + dy1 * dy2
+    angle = math.degrees(math.atan2(abs(cross), dot_product))
+
+    if (bx > yx) == arm_is_right:
+        movement_code = 0  # radial
+        min_val = min_radial
+        max_val = max_radial
+    else:
+        movement_code = 1  # ulnar
+        min_val = min_ulnar
+        max_val = max_ulnar
+
+    if angle > max_val:
+        feedback_code = 2
+    elif angle < min_val:
+        feedback_code = 1
+    else:
+        feedback_code = 0
+
+    return angle, movement_code, feedback_code
+
 
 class WristMotionCapture:
     """Main class for wrist motion capture and analysis."""
@@ -55,19 +114,51 @@ class WristMotionCapture:
         self.kernel = np.ones((KERNEL_SIZE, KERNEL_SIZE), np.uint8)
         self.arm = None
         self.rom_ranges = {}
+        self.rom_bounds = (0, 0, 0, 0)
+
+        # Per-channel lookup tables (255 where in range) so the H/S/V
+        # planes are each read once per frame and shared by all colors
+        ramp = np.arange(256)
+        self.color_luts = {}
+        for color, ranges in COLOR_RANGES.items():
+            self.color_luts[color] = tuple(
+                (((ramp >= low) & (ramp <= high)) * 255).astype(np.uint8)
+                for low, high in zip(ranges['low'], ranges['high'])
+            )
         
         # Progress tracking
         self.session_start_time = None
-        self.session_angles = []
-        self.session_feedback = []
-        self.radial_angles = []
-        self.ulnar_angles = []
         self.total_movements = 0
         self.good_movements = 0
         self.max_radial_achieved = 0
         self.max_ulnar_achieved = 0
-        self.recent_angles = deque(maxlen=30)
+
+        # Session log as one growable array with columns (angle,
+        # movement_code, is_good); summary statistics reduce over columns
+        # instead of walking parallel Python lists
+        self._log = np.empty((1024, 3), np.float32)
+        self._log_n = 0
+
+        # Ring buffer of recent angles for the trend display
+        self._ring = np.empty(RECENT_WINDOW, np.float32)
+        self._ring_idx = 0
         
+        # Result rows buffered between CSV flushes
+        self._pending_rows = []
+
+        # Last known marker positions (downscaled coordinates) for the
+        # ROI search; None means search the whole frame
+        self._last_pos = {color: None for color in COLOR_RANGES}
+
+        # Reused canvas for the feedback window; returning the same buffer
+        # every frame is safe because cv2.imshow copies internally
+        self._feedback_img = np.empty((WINDOW_HEIGHT, WINDOW_WIDTH, 3), np.uint8)
+
+        # Cached slow layer of the feedback window (max angles, recorded
+        # angles, trend); re-rendered only when those values change
+        self._feedback_bg = np.empty((WINDOW_HEIGHT, WINDOW_WIDTH, 3), np.uint8)
+        self._feedback_bg_key = None
+
         # Manual recording tracking
         self.recorded_angles = []
         self.recorded_timestamps = []
@@ -112,7 +203,10 @@ class WristMotionCapture:
                 'min_ulnar': min_ulnar,
                 'max_ulnar': max_ulnar
             }
-            
+            # Flat bounds for the jitted kernel, so the hot loop does no
+            # dict lookups
+            self.rom_bounds = (min_radial, max_radial, min_ulnar, max_ulnar)
+
         except ValueError:
             print("Invalid input. Please enter numeric values for ROM ranges.")
             sys.exit(1)
@@ -123,6 +217,12 @@ class WristMotionCapture:
         if not self.cap.isOpened():
             print("Error: Could not open camera")
             sys.exit(1)
+
+        # Wrist motion is slow; cap the camera rate and resolution so the
+        # pipeline is not fed more pixels than the analysis needs
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_WIDTH)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_HEIGHT)
+        self.cap.set(cv2.CAP_PROP_FPS, CAMERA_FPS)
         return self.cap
     
     def setup_windows(self):
@@ -131,123 +231,105 @@ class WristMotionCapture:
         cv2.namedWindow('angles')
         cv2.namedWindow('ROM')
     
-    def create_color_masks(self, hsv_img):
-        """Create color masks for all marker colors."""
+    def create_color_mask(self, color, h, s, v):
+        """Create a full-frame mask for one marker color."""
+        h_lut, s_lut, v_lut = self.color_luts[color]
+
+        # Hue first, full frame; S and V are then tested only on the
+        # pixels that survived the hue gate, which for small markers is
+        # a tiny fraction of the frame
+        mask = cv2.LUT(h, h_lut)
+        flat_mask = mask.reshape(-1)
+        survivors = np.flatnonzero(flat_mask)
+        if survivors.size:
+            flat_mask[survivors] = (s_lut[s.reshape(-1)[survivors]] &
+                                    v_lut[v.reshape(-1)[survivors]])
+        return mask
+
+    def locate_markers(self, hsv_img):
+        """Locate all marker centroids in the downscaled HSV frame.
+
+        Each color is first searched in a window around its last known
+        position; a marker missing from its window falls back to a
+        full-frame search the same frame.
+        """
         eroded_hsv = cv2.erode(hsv_img, self.kernel, iterations=1)
-        masks = {}
-        results = {}
-        
-        for color, ranges in COLOR_RANGES.items():
-            low = np.array(ranges['low'], dtype="uint8")
-            high = np.array(ranges['high'], dtype="uint8")
-            
-            mask = cv2.inRange(eroded_hsv, low, high)
-            result = cv2.bitwise_or(hsv_img, hsv_img, mask=mask)
-            
-            masks[color] = mask
-            results[color] = result
-        
-        return masks, results
-    
-    def get_centroid(self, image):
-        """Calculate centroid of a color-filtered image."""
-        eroded = cv2.erode(image, self.kernel, iterations=1)
-        grayscale = cv2.cvtColor(eroded, cv2.COLOR_BGR2GRAY)
-        moments = cv2.moments(grayscale)
-        
-        if moments["m00"] == 0:
-            return 1, 1  # Default position when marker not detected
-        else:
-            x = int(moments["m10"] / moments["m00"])
-            y = int(moments["m01"] / moments["m00"])
-            return x, y
-    
-    def calculate_angle(self, orange_pos, yellow_pos, pink_pos, blue_pos):
-        """Calculate angle between two line segments formed by markers."""
-        # Line 1: orange to blue (MG)
-        # Line 2: yellow to pink (CY)
-        
-        gx, gy = blue_pos
-        mx, my = orange_pos
-        cx, cy = yellow_pos
-        yx, yy = pink_pos
-        
-        # Calculate dot product
-        dot_product = ((gx - mx) * (yx - cx)) + ((gy - my) * (yy - cy))
-        
-        # Calculate magnitudes
-        mg_magnitude = math.sqrt((gx - mx)**2 + (gy - my)**2)
-        cy_magnitude = math.sqrt((yx - cx)**2 + (yy - cy)**2)
-        
-        # Calculate denominator
-        denominator = mg_magnitude * cy_magnitude
-        
-        # Avoid division by zero
-        if denominator == 0:
-            denominator = 0.01
-        
-        # Calculate angle in radians then convert to degrees
-        try:
-            angle_rad = math.acos(abs(dot_product) / denominator)
-            angle_deg = angle_rad * 180 / math.pi
-            final_angle = 180 - angle_deg
-            return final_angle
-        except ValueError:
-            return 0  # Return 0 if calculation fails
-    
-    def determine_movement_type(self, blue_pos, yellow_pos):
-        """Determine if movement is radial or ulnar deviation."""
-        blue_x, _ = blue_pos
-        yellow_x, _ = yellow_pos
-        
-        if self.arm == "R":  # Right arm
-            if blue_x > yellow_x:
-                return "radial"
-            else:
-                return "ulnar"
-        else:  # Left arm
-            if blue_x > yellow_x:
-                return "ulnar"
-            else:
-                return "radial"
-    
-    def get_feedback(self, movement_type, angle):
-        """Get feedback message and color based on angle and ROM ranges."""
-        if movement_type == "radial":
-            min_val = self.rom_ranges['min_radial']
-            max_val = self.rom_ranges['max_radial']
-        else:
-            min_val = self.rom_ranges['min_ulnar']
-            max_val = self.rom_ranges['max_ulnar']
-        
-        if angle > max_val:
-            return "TOO FAR", COLORS['text_bad']
-        elif angle < min_val:
-            return "TOO LITTLE", COLORS['text_bad']
-        else:
-            return "GREAT", COLORS['text_good']
+        h, s, v = cv2.split(eroded_hsv)
+        rows, cols = h.shape
+        positions = {}
+
+        for color in self.color_luts:
+            pos = None
+            last = self._last_pos[color]
+            if last is not None:
+                x0 = max(0, last[0] - ROI_RADIUS)
+                y0 = max(0, last[1] - ROI_RADIUS)
+                x1 = min(cols, last[0] + ROI_RADIUS)
+                y1 = min(rows, last[1] + ROI_RADIUS)
+                h_lut, s_lut, v_lut = self.color_luts[color]
+                roi_mask = (h_lut[h[y0:y1, x0:x1]] &
+                            s_lut[s[y0:y1, x0:x1]] &
+                            v_lut[v[y0:y1, x0:x1]])
+                pos = self.get_centroid(roi_mask)
+                if pos is not None:
+                    pos = (pos[0] + x0, pos[1] + y0)
+
+            if pos is None:
+                pos = self.get_centroid(self.create_color_mask(color, h, s, v))
+
+            positions[color] = pos
+            self._last_pos[color] = pos
+
+        return positions
+
+    def get_centroid(self, mask):
+        """Calculate centroid of a single-channel color mask."""
+        x, y, w, h = cv2.boundingRect(mask)
+
+        if w == 0:
+            return None  # Marker not detected
+
+        return x + w // 2, y + h // 2
+
+    def scale_position(self, position):
+        """Scale a downscaled-mask position back to frame coordinates."""
+        return position[0] * DOWNSCALE, position[1] * DOWNSCALE
     
-    def save_data(self, angle, movement_type, is_good_movement):
-        """Save angle data with progress tracking."""
+    def flush_pending_rows(self):
+        """Write buffered angle rows to results.csv in one file open."""
+        if not self._pending_rows:
+            return
         try:
             with open("results.csv", "a", newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([datetime.datetime.now(), int(angle), movement_type, "GREAT" if is_good_movement else "POOR"])
+                csv.writer(f).writerows(self._pending_rows)
+            self._pending_rows.clear()
         except IOError as e:
             print(f"Error saving data: {e}")
-        
+
+    def save_data(self, angle, movement_code, is_good_movement):
+        """Save angle data with progress tracking."""
+        # Buffer the row; opening the CSV every frame costs more than the
+        # rest of the bookkeeping combined
+        self._pending_rows.append([datetime.datetime.now(), int(angle),
+                                   MOVEMENT_LABELS[movement_code],
+                                   "GREAT" if is_good_movement else "POOR"])
+        if len(self._pending_rows) >= CSV_FLUSH_ROWS:
+            self.flush_pending_rows()
+
         # Update session tracking
-        self.session_angles.append(angle)
-        self.recent_angles.append(angle)
+        if self._log_n == len(self._log):
+            self._log = np.concatenate((self._log, np.empty_like(self._log)))
+        self._log[self._log_n] = (angle, movement_code, is_good_movement)
+        self._log_n += 1
+        self._ring[self._ring_idx % RECENT_WINDOW] = angle
+        self._ring_idx += 1
         self.total_movements += 1
         if is_good_movement:
             self.good_movements += 1
-        
-        if movement_type.lower() == 'radial':
-            self.radial_angles.append(angle)
+
+        if movement_code == 0:  # radial
             self.max_radial_achieved = max(self.max_radial_achieved, angle)
         else:
-            self.ulnar_angles.append(angle)
             self.max_ulnar_achieved = max(self.max_ulnar_achieved, angle)
     
     def record_manual_angle(self, angle, movement_type):
@@ -271,6 +353,9 @@ class WristMotionCapture:
     
     def save_session_summary(self):
         """Save session summary and recorded angles."""
+        # Flush any angle rows still buffered for results.csv
+        self.flush_pending_rows()
+
         # Save recorded angles to separate file
         if len(self.recorded_angles) > 0:
             try:
@@ -289,17 +374,19 @@ class WristMotionCapture:
                 print(f"Error saving recorded angles: {e}")
         
         # Save session summary to JSON
-        if self.session_start_time and len(self.session_angles) > 0:
+        if self.session_start_time and self._log_n > 0:
             try:
                 history = []
                 if os.path.exists('progress_history.json'):
                     with open('progress_history.json', 'r') as f:
                         history = json.load(f)
-                
+
                 duration = (datetime.datetime.now() - self.session_start_time).total_seconds() / 60
+                log = self._log[:self._log_n]
+                radial_count = int((log[:, 1] == 0).sum())
                 accuracy = (self.good_movements / self.total_movements * 100) if self.total_movements > 0 else 0
-                avg_angle = statistics.mean(self.session_angles) if self.session_angles else 0
-                
+                avg_angle = float(log[:, 0].mean())
+
                 session_summary = {
                     'date': self.session_start_time.isoformat(),
                     'arm': self.arm,
@@ -307,8 +394,8 @@ class WristMotionCapture:
                     'total_movements': self.total_movements,
                     'accuracy_percentage': round(accuracy, 1),
                     'avg_angle': round(avg_angle, 1),
-                    'radial_count': len(self.radial_angles),
-                    'ulnar_count': len(self.ulnar_angles),
+                    'radial_count': radial_count,
+                    'ulnar_count': self._log_n - radial_count,
                     'max_radial': self.max_radial_achieved,
                     'max_ulnar': self.max_ulnar_achieved,
                     'recorded_angles': self.recorded_angles.copy(),
@@ -336,37 +423,40 @@ class WristMotionCapture:
             except Exception as e:
                 print(f"Error saving session summary: {e}")
     
-    def create_feedback_image(self, movement_type, feedback_msg, feedback_color, current_angle):
-        """Create the feedback display image with progress tracking."""
-        image = np.zeros((WINDOW_HEIGHT, WINDOW_WIDTH, 3), np.uint8)
-        image[:] = [255, 255, 255]  # White background
-        
-        # Display movement type and current angle
-        movement_text = f"{movement_type.title()} Deviation: {current_angle:.1f}°"
-        cv2.putText(image, movement_text, (50, 50), cv2.FONT_HERSHEY_PLAIN, 
-                   2, COLORS['text_black'], 2, 8)
-        
-        # Display feedback
-        cv2.putText(image, feedback_msg, (50, 150), cv2.FONT_HERSHEY_COMPLEX, 
-                   2, feedback_color, 3, 8)
-        
-        # Display session progress
-        accuracy = (self.good_movements / self.total_movements * 100) if self.total_movements > 0 else 0
-        cv2.putText(image, f"Session: {self.total_movements} moves, {accuracy:.1f}% accuracy", (20, 200), cv2.FONT_HERSHEY_PLAIN, 1, COLORS['text_black'], 1, 8)
+    def render_feedback_background(self, trend_text, trend_color):
+        """Render the slow-changing layer of the feedback window."""
+        image = self._feedback_bg
+        image.fill(255)  # White background
+
         cv2.putText(image, f"Max Radial: {self.max_radial_achieved:.1f}°", (20, 220), cv2.FONT_HERSHEY_PLAIN, 1, COLORS['text_black'], 1, 8)
         cv2.putText(image, f"Max Ulnar: {self.max_ulnar_achieved:.1f}°", (20, 240), cv2.FONT_HERSHEY_PLAIN, 1, COLORS['text_black'], 1, 8)
-        
+
         # Display recorded angles
         if len(self.recorded_angles) > 0:
             cv2.putText(image, f"Recorded: {len(self.recorded_angles)} angles", (20, 260), cv2.FONT_HERSHEY_PLAIN, 1, COLORS['text_black'], 1, 8)
             last_recorded = self.recorded_angles[-1]
             cv2.putText(image, f"Last: {last_recorded:.1f}°", (20, 280), cv2.FONT_HERSHEY_PLAIN, 1, (0,100,0), 1, 8)
-        
+
         # Display trend
-        if len(self.recent_angles) >= 10:
-            recent_avg = statistics.mean(list(self.recent_angles)[-10:])
-            earlier_avg = statistics.mean(list(self.recent_angles)[:10]) if len(self.recent_angles) >= 20 else recent_avg
-            
+        if trend_text is not None:
+            cv2.putText(image, trend_text, (20, 300), cv2.FONT_HERSHEY_PLAIN, 1, trend_color, 1, 8)
+
+    def create_feedback_image(self, movement_type, feedback_msg, feedback_color, current_angle):
+        """Create the feedback display image with progress tracking."""
+        # Work out the trend category first; it belongs to the cached layer
+        trend_text = None
+        trend_color = COLORS['text_black']
+        count = min(self._ring_idx, RECENT_WINDOW)
+        if count >= 10:
+            recent_avg = self._ring.take(
+                np.arange(self._ring_idx - 10, self._ring_idx), mode='wrap').mean()
+            if count >= 20:
+                start = self._ring_idx - count
+                earlier_avg = self._ring.take(
+                    np.arange(start, start + 10), mode='wrap').mean()
+            else:
+                earlier_avg = recent_avg
+
             if recent_avg > earlier_avg * 1.05:
                 trend_text = "Trend: ↗ Improving"
                 trend_color = COLORS['text_good']
@@ -375,10 +465,31 @@ class WristMotionCapture:
                 trend_color = COLORS['text_bad']
             else:
                 trend_text = "Trend: → Stable"
-                trend_color = COLORS['text_black']
-            
-            cv2.putText(image, trend_text, (20, 300), cv2.FONT_HERSHEY_PLAIN, 1, trend_color, 1, 8)
-        
+
+        # Re-render the slow layer only when one of its values changes
+        bg_key = (round(self.max_radial_achieved, 1), round(self.max_ulnar_achieved, 1),
+                  len(self.recorded_angles), trend_text)
+        if bg_key != self._feedback_bg_key:
+            self.render_feedback_background(trend_text, trend_color)
+            self._feedback_bg_key = bg_key
+
+        image = self._feedback_img
+        np.copyto(image, self._feedback_bg)
+
+        # Display movement type and current angle
+        movement_text = f"{movement_type.title()} Deviation: {current_angle:.1f}°"
+        cv2.putText(image, movement_text, (50, 50), cv2.FONT_HERSHEY_PLAIN,
+                   2, COLORS['text_black'], 2, 8)
+
+        # Display feedback
+        cv2.putText(image, feedback_msg, (50, 150), cv2.FONT_HERSHEY_COMPLEX,
+                   2, feedback_color, 3, 8)
+
+        # Display session progress (the movement counter changes per frame,
+        # so it stays on the fast layer)
+        accuracy = (self.good_movements / self.total_movements * 100) if self.total_movements > 0 else 0
+        cv2.putText(image, f"Session: {self.total_movements} moves, {accuracy:.1f}% accuracy", (20, 200), cv2.FONT_HERSHEY_PLAIN, 1, COLORS['text_black'], 1, 8)
+
         return image
     
     def run(self):
@@ -390,49 +501,77 @@ class WristMotionCapture:
         
         # Initialize session tracking
         self.session_start_time = datetime.datetime.now()
-        
+
+        # Warm-compile the jitted kernel before the frame loop
+        arm_is_right = self.arm == "R"
+        process_markers(0, 0, 0, 0, 1, 1, 1, 1, arm_is_right, *self.rom_bounds)
+
         print("Press on video, then ESC to exit...")
-        
+
+        frame_index = 0
         while True:
-            # Capture frame
-            ret, frame = self.cap.read()
+            # Grab every camera frame but only decode every FRAME_STRIDE-th
+            # one; grab() skips the JPEG/YUV decode entirely
+            if not self.cap.grab():
+                print("Error: Could not read frame")
+                break
+            frame_index += 1
+            if frame_index % FRAME_STRIDE:
+                continue
+
+            ret, frame = self.cap.retrieve()
             if not ret:
                 print("Error: Could not read frame")
                 break
-            
-            # Convert to HSV
+
+            # Convert to HSV and downscale for segmentation; four (x,y)
+            # centroids do not need full webcam resolution
             hsv_img = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-            
-            # Create color masks and get results
-            masks, results = self.create_color_masks(hsv_img)
-            
-            # Get centroids for each color
-            orange_pos = self.get_centroid(results['orange'])
-            yellow_pos = self.get_centroid(results['yellow'])
-            pink_pos = self.get_centroid(results['pink'])
-            blue_pos = self.get_centroid(results['blue'])
-            
+            small_hsv = cv2.pyrDown(hsv_img)
+
+            # Locate marker centroids (None when a marker is missing)
+            positions = self.locate_markers(small_hsv)
+            orange_pos = positions['orange']
+            yellow_pos = positions['yellow']
+            pink_pos = positions['pink']
+            blue_pos = positions['blue']
+
+            # Skip analysis when any marker is lost; an angle computed from
+            # placeholder positions would only pollute the CSV and stats
+            if None in (orange_pos, yellow_pos, pink_pos, blue_pos):
+                cv2.imshow('frame', frame)
+                if (cv2.waitKey(1) & 0xFF) == ESC_KEY:
+                    break
+                continue
+
+            # Scale positions back to frame coordinates
+            orange_pos = self.scale_position(orange_pos)
+            yellow_pos = self.scale_position(yellow_pos)
+            pink_pos = self.scale_position(pink_pos)
+            blue_pos = self.scale_position(blue_pos)
+
+            # Draw the marker overlay directly on a copy of the frame; no
+            # need to merge the per-color masks just for display
+            combined_image = frame.copy()
+
             # Draw circles on markers
-            cv2.circle(results['orange'], orange_pos, CIRCLE_RADIUS, COLORS['orange_circle'], CIRCLE_THICKNESS)
-            cv2.circle(results['yellow'], yellow_pos, CIRCLE_RADIUS, COLORS['yellow_circle'], CIRCLE_THICKNESS)
-            cv2.circle(results['pink'], pink_pos, CIRCLE_RADIUS, COLORS['pink_circle'], CIRCLE_THICKNESS)
-            cv2.circle(results['blue'], blue_pos, CIRCLE_RADIUS, COLORS['blue_circle'], CIRCLE_THICKNESS)
-            
-            # Combine all marker images
-            combined_image = cv2.bitwise_or(results['orange'], results['yellow'])
-            combined_image = cv2.bitwise_or(combined_image, results['pink'])
-            combined_image = cv2.bitwise_or(combined_image, results['blue'])
-            
+            cv2.circle(combined_image, orange_pos, CIRCLE_RADIUS, COLORS['orange_circle'], CIRCLE_THICKNESS)
+            cv2.circle(combined_image, yellow_pos, CIRCLE_RADIUS, COLORS['yellow_circle'], CIRCLE_THICKNESS)
+            cv2.circle(combined_image, pink_pos, CIRCLE_RADIUS, COLORS['pink_circle'], CIRCLE_THICKNESS)
+            cv2.circle(combined_image, blue_pos, CIRCLE_RADIUS, COLORS['blue_circle'], CIRCLE_THICKNESS)
+
             # Draw lines between markers
             cv2.line(combined_image, orange_pos, blue_pos, COLORS['line'], LINE_THICKNESS)
             cv2.line(combined_image, yellow_pos, pink_pos, COLORS['line'], LINE_THICKNESS)
             
-            # Calculate angle
-            angle = self.calculate_angle(orange_pos, yellow_pos, pink_pos, blue_pos)
-            
-            # Determine movement type and get feedback
-            movement_type = self.determine_movement_type(blue_pos, yellow_pos)
-            feedback_msg, feedback_color = self.get_feedback(movement_type, angle)
+            # Calculate angle, movement type and feedback in one jitted call
+            angle, movement_code, feedback_code = process_markers(
+                orange_pos[0], orange_pos[1], yellow_pos[0], yellow_pos[1],
+                pink_pos[0], pink_pos[1], blue_pos[0], blue_pos[1],
+                arm_is_right, *self.rom_bounds)
+            movement_type = MOVEMENT_LABELS[movement_code]
+            feedback_msg = FEEDBACK_LABELS[feedback_code]
+            feedback_color = FEEDBACK_COLORS[feedback_code]
             
             # Create feedback image with progress info
             feedback_image = self.create_feedback_image(movement_type, feedback_msg, feedback_color, angle)
@@ -441,7 +580,7 @@ class WristMotionCapture:
             is_good_movement = feedback_msg == "GREAT"
             
             # Save data with progress tracking
-            self.save_data(angle, movement_type, is_good_movement)
+            self.save_data(angle, movement_code, is_good_movement)
             
             # Display images
             cv2.imshow('ROM', feedback_image)